@@ -1,6 +1,11 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, send_file, url_for
 import sqlite3
 import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
 import os
 from typing import Dict, List, Set, Tuple, Optional
@@ -11,6 +16,7 @@ import matplotlib.animation as animation
 from typing import Dict, List, Set, Tuple
 import numpy as np
 from millennium_falcon import MillenniumFalcon
+from mission_rendering import render_mission, universe_key
 from database_tools import create_universe_database
 
 """
@@ -27,6 +33,50 @@ UPLOAD_FOLDER.mkdir(exist_ok=True)
 
 # Configure Flask app
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Search backend used by /calculate: 'dfs' or one of mission_solvers.SOLVERS
+app.config['SOLVER'] = os.environ.get('FALCON_SOLVER', 'dfs')
+
+# Mission maps are rendered by background workers on first request and served from a small in-memory cache;
+# evicting an entry cancels its renders that have not started, so the queue never outgrows the cache
+# A single worker: matplotlib is not thread safe even with one Figure per thread (the font cache and FreeType
+# objects are shared), so renders must never run concurrently within the process
+RENDER_WORKERS = ThreadPoolExecutor(max_workers=1)
+VISUALIZATION_CACHE_SIZE = 64
+VISUALIZATION_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+visualizations: "OrderedDict[str, Dict]" = OrderedDict()
+visualizations_lock = threading.Lock()
+
+
+def submit_render(key: str, fmt: str) -> Future:
+    """Start rendering a cached mission in `fmt` unless already started (call with the lock held)."""
+    entry = visualizations[key]
+    if fmt not in entry['renders']:
+        entry['renders'][fmt] = RENDER_WORKERS.submit(render_mission, *entry['args'], fmt=fmt)
+    return entry['renders'][fmt]
+
+
+def schedule_visualization(falcon: MillenniumFalcon, odds: float) -> str:
+    """
+    Cache the mission the falcon just solved, with the empire data it was solved for, and return its key.
+    Nothing is rendered until the visualization is first requested.
+    """
+    countdown, bounty_hunters = falcon.countdown, falcon.bounty_hunters
+    args = (falcon.routes, falcon.departure, falcon.arrival, countdown, bounty_hunters, falcon.best_path, odds)
+    key = hashlib.sha1(json.dumps([
+        universe_key(falcon.routes), falcon.departure, falcon.arrival, countdown,
+        sorted(bounty_hunters), falcon.best_path, odds
+    ]).encode()).hexdigest()
+
+    with visualizations_lock:
+        if key not in visualizations:
+            visualizations[key] = {'args': args, 'renders': {}}
+            while len(visualizations) > VISUALIZATION_CACHE_SIZE:
+                _, evicted = visualizations.popitem(last=False)
+                for render in evicted['renders'].values():
+                    render.cancel()
+        visualizations.move_to_end(key)
+    return key
+
 
 @app.route('/')
 def home():
@@ -50,22 +100,40 @@ def calculate():
         empire_file.save(empire_path)
 
         # Calculate odds
-        falcon = MillenniumFalcon(str(millennium_path))
+        falcon = MillenniumFalcon(str(millennium_path), solver=app.config['SOLVER'])
         odds, debug_info = falcon.calculate_odds_with_debug(str(empire_path))
 
-        # # Generate visualization
-        # visualization_path = UPLOAD_FOLDER / 'mission_visualization.png'
-        # falcon.visualize_mission_dynamic(str(empire_path), odds)
+        # The visualization is rendered in the background once the page asks for it, the page polls for it
+        visualization_key = schedule_visualization(falcon, odds)
 
         return jsonify({
             'success': True,
             'odds': odds,
-            'debug_info': debug_info
+            'debug_info': debug_info,
+            'visualization_url': url_for('visualization', key=visualization_key, fmt='png')
         })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/visualization/<key>.<fmt>')
+def visualization(key, fmt):
+    if fmt not in VISUALIZATION_FORMATS:
+        return jsonify({'success': False, 'error': f'Unsupported format: {fmt}'}), 404
+
+    with visualizations_lock:
+        if key not in visualizations:
+            return jsonify({'success': False, 'error': 'Unknown visualization'}), 404
+        render = submit_render(key, fmt)
+
+    if not render.done():
+        return jsonify({'success': True, 'pending': True}), 202
+    try:
+        image = render.result()
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return send_file(BytesIO(image), mimetype=VISUALIZATION_FORMATS[fmt])
+
 
 
 if __name__ == '__main__':
@@ -4,6 +4,7 @@ import sys
 from pathlib import Path
 
 from millennium_falcon import MillenniumFalcon  # Assuming the class is in a separate file
+from mission_solvers import DEFAULT_MEMORY_BUDGET, SOLVERS
 
 """
 Assignment title: R2D3
@@ -45,6 +46,18 @@ def main():
         action="store_true",
         help="Show detailed calculation information"
     )
+    parser.add_argument(
+        "--solver",
+        choices=["dfs"] + list(SOLVERS),
+        default="dfs",
+        help="Path search backend (dfs enumerates every path, the others only keep the best one)"
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=DEFAULT_MEMORY_BUDGET // (1024 * 1024),
+        help="Memory budget in MB for the rolling solver"
+    )
     
     # Parse arguments
     args = parser.parse_args()
@@ -60,7 +73,8 @@ def main():
     
     try:
         # Initialize the Millennium Falcon with the config file
-        falcon = MillenniumFalcon(args.falcon_config)
+        falcon = MillenniumFalcon(args.falcon_config, solver=args.solver,
+                                  memory_budget=args.memory_budget * 1024 * 1024)
         
         # Calculate odds and get results
         if args.debug:
@@ -79,9 +93,9 @@ def main():
         # Generate visualization if requested
         if args.visualize:
             if args.interactive:
-                falcon.visualize_mission_dynamic(args.empire_data, odds)
+                falcon.visualize_mission_dynamic(args.empire_data, odds, falcon.best_path)
             else:
-                falcon.visualize_mission(args.empire_data, odds)
+                falcon.visualize_mission(args.empire_data, odds, falcon.best_path)
                 
     except ValueError as e:
         if "too many values to unpack" in str(e):
@@ -0,0 +1,379 @@
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from millennium_falcon import MillenniumFalcon
+from mission_solvers import SOLVERS
+
+"""
+Purpose: Load benchmark for the /calculate endpoint of the Flask backend
+Assignment title: The "Millennium Falcon onboard computer"
+
+The app is started locally, either through Flask's test client or a threaded WSGI server on a free port, and
+hit by concurrent uploads mixing the small example scenarios with a synthetic large galaxy. Every answer is
+checked against odds computed up front, so requests that step on each other's uploads show up as wrong
+answers rather than passing silently. The report gives throughput, p50/p95/p99 latency of the correct
+answers, error rate, response sizes and the resident memory of the process serving the requests over the run.
+
+Usage: python load_benchmark.py --requests 200 --concurrency 8 --large-fraction 0.2 --server wsgi
+"""
+
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+SMALL_EMPIRES = ['empire041.json', 'empire042.json', 'empire043.json', 'empire044.json']
+
+
+class Scenario:
+    """
+    One upload pair with the odds the endpoint is expected to return for it. Every backend gives the same odds,
+    so they are computed with the label-setting solver, which stays fast where the full DFS would not.
+    """
+
+    def __init__(self, name: str, kind: str, falcon_file: Path, empire_file: Path):
+        self.name = name
+        self.kind = kind
+        self.falcon_bytes = falcon_file.read_bytes()
+        self.empire_bytes = empire_file.read_bytes()
+        with contextlib.redirect_stdout(io.StringIO()):
+            falcon = MillenniumFalcon(str(falcon_file), solver='labels')
+            self.expected_odds = falcon.calculate_odds(str(empire_file))
+
+
+def create_small_scenarios(work_dir: Path) -> List[Scenario]:
+    """The example scenarios, with the routes database pointed at by absolute path so uploads can find it."""
+    config = json.loads((DATA_DIR / 'millennium-falcon.json').read_text())
+    config['routes_db'] = str(DATA_DIR / config['routes_db'])
+    falcon_file = work_dir / 'small-millennium-falcon.json'
+    falcon_file.write_text(json.dumps(config))
+    return [Scenario(empire, 'small', falcon_file, DATA_DIR / empire) for empire in SMALL_EMPIRES]
+
+
+def create_large_scenario(work_dir: Path, planets: int, countdown: int, hunters: int, seed: int) -> Scenario:
+    """
+    A random galaxy of `planets` planets: a spine from departure to arrival that fits in the countdown, the
+    other planets hung on a random tree, a quarter as many extra routes and `hunters` bounty hunters.
+    """
+    rng = random.Random(seed)
+    names = [f'Planet-{i}' for i in range(planets)]
+    spine = names[:max(2, min(planets, countdown // 4 + 1))]
+    routes: Dict[Tuple[str, str], int] = {}
+    for origin, destination in zip(spine, spine[1:]):
+        routes[(origin, destination)] = rng.randint(1, 3)
+    for i in range(len(spine), planets):
+        routes[(names[rng.randrange(i)], names[i])] = rng.randint(1, 6)
+    for _ in range(planets // 4):
+        origin, destination = rng.sample(names, 2)
+        if (origin, destination) not in routes and (destination, origin) not in routes:
+            routes[(origin, destination)] = rng.randint(1, 6)
+
+    db_path = work_dir / 'large-universe.db'
+    db_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE routes (origin TEXT, destination TEXT, travel_time INTEGER)')
+    conn.executemany('INSERT INTO routes VALUES (?, ?, ?)', [(o, d, t) for (o, d), t in routes.items()])
+    conn.commit()
+    conn.close()
+
+    falcon_file = work_dir / 'large-millennium-falcon.json'
+    falcon_file.write_text(json.dumps({
+        'autonomy': 10, 'departure': spine[0], 'arrival': spine[-1], 'routes_db': str(db_path)
+    }))
+    empire_file = work_dir / 'large-empire.json'
+    empire_file.write_text(json.dumps({
+        'countdown': countdown,
+        'bounty_hunters': [{'planet': rng.choice(names), 'day': rng.randint(0, countdown)}
+                           for _ in range(hunters)]
+    }))
+    return Scenario(f'synthetic-{planets}', 'large', falcon_file, empire_file)
+
+
+def multipart_body(falcon_bytes: bytes, empire_bytes: bytes) -> Tuple[bytes, str]:
+    """Encode both uploads the way the web page's form does."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for field, filename, content in [('millennium', 'millennium-falcon.json', falcon_bytes),
+                                     ('empire', 'empire.json', empire_bytes)]:
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/json\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class TestClientTarget:
+    """
+    Drives the app in-process through Flask's test client. Each request runs in its own daemon thread so it
+    can be given up on after `timeout` seconds; the request itself cannot be interrupted and keeps running in
+    the background until it finishes or the benchmark exits.
+    """
+
+    def __init__(self, app, timeout: float):
+        self.app = app
+        self.timeout = timeout
+
+    def _post(self, scenario: Scenario) -> Tuple[int, bytes]:
+        response = self.app.test_client().post('/calculate', data={
+            'millennium': (io.BytesIO(scenario.falcon_bytes), 'millennium-falcon.json'),
+            'empire': (io.BytesIO(scenario.empire_bytes), 'empire.json'),
+        }, content_type='multipart/form-data')
+        return response.status_code, response.get_data()
+
+    def post(self, scenario: Scenario) -> Tuple[int, bytes]:
+        outcome: Dict = {}
+
+        def request():
+            try:
+                outcome['response'] = self._post(scenario)
+            except Exception as e:
+                outcome['error'] = e
+
+        worker = threading.Thread(target=request, daemon=True)
+        worker.start()
+        worker.join(self.timeout)
+        if worker.is_alive():
+            raise TimeoutError(f"no response within {self.timeout:g} s")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['response']
+
+    def close(self):
+        pass
+
+
+class WsgiTarget:
+    """Serves the app with a threaded werkzeug server on a free local port and talks real HTTP to it."""
+
+    def __init__(self, app, timeout: float):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        self.timeout = timeout
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def post(self, scenario: Scenario) -> Tuple[int, bytes]:
+        body, content_type = multipart_body(scenario.falcon_bytes, scenario.empire_bytes)
+        conn = http.client.HTTPConnection('127.0.0.1', self.server.server_port, timeout=self.timeout)
+        try:
+            conn.request('POST', '/calculate', body=body, headers={'Content-Type': content_type})
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+    def close(self):
+        self.server.shutdown()
+        self.thread.join()
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident memory of this process in MB, from /proc when available, else the peak from getrusage."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class RssSampler:
+    """Samples the resident memory every `interval` seconds in a background thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: List[Tuple[float, float]] = []
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        start = time.perf_counter()
+        while True:
+            rss = current_rss_mb()
+            if rss is not None:
+                self.samples.append((time.perf_counter() - start, rss))
+            if self.stopped.wait(self.interval):
+                break
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        rss = current_rss_mb()
+        if rss is not None and self.samples:
+            self.samples.append((self.samples[-1][0], rss))
+
+
+def send(target, scenario: Scenario, started: float) -> Dict:
+    """Fire one request and classify the answer as ok, wrong (unexpected odds) or error."""
+    begin = time.perf_counter()
+    try:
+        status, body = target.post(scenario)
+    except Exception as e:
+        return {'kind': scenario.kind, 'scenario': scenario.name, 'start': begin - started,
+                'latency': time.perf_counter() - begin, 'outcome': 'error', 'error': repr(e), 'bytes': 0}
+    latency = time.perf_counter() - begin
+    outcome, error = 'ok', None
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = {}
+    if status != 200 or not payload.get('success'):
+        outcome, error = 'error', payload.get('error', f'HTTP {status}')
+    elif abs(payload['odds'] - scenario.expected_odds) > 1e-9:
+        outcome, error = 'wrong', f"odds {payload['odds']} instead of {scenario.expected_odds}"
+    return {'kind': scenario.kind, 'scenario': scenario.name, 'start': begin - started, 'latency': latency,
+            'outcome': outcome, 'error': error, 'bytes': len(body)}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted `values`."""
+    if not values:
+        return float('nan')
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+def summarize(results: List[Dict], elapsed: float, rss: List[Tuple[float, float]]) -> Dict:
+    """
+    Aggregate the per-request results. Latency percentiles only cover correct answers, per scenario kind;
+    errors and wrong answers get their own line, so a fast failure path cannot flatter the percentiles.
+    """
+    summary = {'requests': len(results), 'elapsed_s': elapsed,
+               'throughput_rps': len(results) / elapsed if elapsed else 0.0, 'latency_ms': {}}
+    groups = {
+        'ok': [r for r in results if r['outcome'] == 'ok'],
+        'ok small': [r for r in results if r['outcome'] == 'ok' and r['kind'] == 'small'],
+        'ok large': [r for r in results if r['outcome'] == 'ok' and r['kind'] == 'large'],
+        'failed': [r for r in results if r['outcome'] != 'ok'],
+    }
+    for group, members in groups.items():
+        latencies = sorted(r['latency'] * 1000 for r in members)
+        if latencies:
+            summary['latency_ms'][group] = {
+                'count': len(latencies), 'p50': percentile(latencies, 50), 'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99), 'max': latencies[-1]
+            }
+    errors = [r for r in results if r['outcome'] == 'error']
+    wrong = [r for r in results if r['outcome'] == 'wrong']
+    summary['errors'] = len(errors)
+    summary['wrong_answers'] = len(wrong)
+    summary['error_rate'] = (len(errors) + len(wrong)) / len(results) if results else 0.0
+    summary['sample_errors'] = sorted({r['error'] for r in errors + wrong})[:5]
+    sizes = [r['bytes'] for r in results if r['outcome'] != 'error']
+    summary['response_bytes'] = {'avg': sum(sizes) / len(sizes) if sizes else 0, 'max': max(sizes, default=0)}
+    summary['rss_mb'] = [{'t': t, 'rss': value} for t, value in rss]
+    return summary
+
+
+def print_report(summary: Dict, args):
+    print(f"Load benchmark: {summary['requests']} requests, concurrency {args.concurrency}, "
+          f"server {args.server}, solver {args.solver}, large fraction {args.large_fraction:g}")
+    print(f"Throughput: {summary['throughput_rps']:.1f} req/s over {summary['elapsed_s']:.2f} s")
+    print(f"{'Latency (ms)':<14}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for group, stats in summary['latency_ms'].items():
+        print(f"  {group:<12}{stats['count']:>7}{stats['p50']:>10.1f}{stats['p95']:>10.1f}"
+              f"{stats['p99']:>10.1f}{stats['max']:>10.1f}")
+    print(f"Errors: {summary['errors']}, wrong answers: {summary['wrong_answers']} "
+          f"(error rate {summary['error_rate']:.1%})")
+    for error in summary['sample_errors']:
+        print(f"  {error}")
+    print(f"Response size: avg {summary['response_bytes']['avg'] / 1024:.1f} KB, "
+          f"max {summary['response_bytes']['max'] / 1024:.1f} KB")
+    rss = summary['rss_mb']
+    if rss:
+        step = max(1, len(rss) // 10)
+        series = ', '.join(f"{s['t']:.1f}s {s['rss']:.0f}" for s in rss[::step])
+        print(f"Server RSS (MB): start {rss[0]['rss']:.1f}, peak {max(s['rss'] for s in rss):.1f}, "
+              f"end {rss[-1]['rss']:.1f}")
+        print(f"  over time: {series}")
+    else:
+        print("Server RSS: not available on this platform")
+
+
+def run(args, work_dir: Path) -> Tuple[Dict, List[Dict]]:
+    """Build the scenarios in `work_dir`, start the app, send the planned requests and summarize them."""
+    from app import app
+    app.config['SOLVER'] = args.solver
+
+    small = create_small_scenarios(work_dir)
+    large = create_large_scenario(work_dir, args.large_planets, args.large_countdown, args.large_hunters, args.seed)
+    rng = random.Random(args.seed)
+    plan = [large if rng.random() < args.large_fraction else small[i % len(small)] for i in range(args.requests)]
+
+    target = WsgiTarget(app, args.timeout) if args.server == 'wsgi' else TestClientTarget(app, args.timeout)
+    sampler = RssSampler(args.sample_interval)
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda scenario: send(target, scenario, started), plan))
+        elapsed = time.perf_counter() - started
+    finally:
+        sampler.stop()
+        target.close()
+
+    return summarize(results, elapsed, sampler.samples), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load benchmark for the /calculate endpoint.")
+    parser.add_argument('--server', choices=['test-client', 'wsgi'], default='test-client',
+                        help="Drive the app in-process or through a local threaded WSGI server.")
+    parser.add_argument('--requests', type=int, default=200, help="Number of requests to send.")
+    parser.add_argument('--concurrency', type=int, default=8, help="Number of requests in flight.")
+    parser.add_argument('--large-fraction', type=float, default=0.2,
+                        help="Share of requests uploading the synthetic large galaxy.")
+    parser.add_argument('--large-planets', type=int, default=80, help="Planets in the synthetic galaxy.")
+    parser.add_argument('--large-countdown', type=int, default=24, help="Countdown of the synthetic empire.")
+    parser.add_argument('--large-hunters', type=int, default=200, help="Bounty hunters of the synthetic empire.")
+    parser.add_argument('--solver', choices=['dfs'] + sorted(SOLVERS), default='dfs',
+                        help="Search backend the app uses.")
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help="Per-request timeout in seconds. With the test client a timed out request is "
+                             "counted as an error but keeps running in the background.")
+    parser.add_argument('--sample-interval', type=float, default=0.5, help="Seconds between RSS samples.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic galaxy and request mix.")
+    parser.add_argument('--json', help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    json_path = Path(args.json).resolve() if args.json else None
+    original_dir = Path.cwd()
+    # The app saves uploads relative to the working directory; keep them out of the repository
+    with tempfile.TemporaryDirectory(prefix='falcon-load-', ignore_cleanup_errors=True) as work_dir:
+        os.chdir(work_dir)
+        try:
+            summary, results = run(args, Path(work_dir))
+        finally:
+            os.chdir(original_dir)
+
+    print_report(summary, args)
+    if json_path:
+        json_path.write_text(json.dumps({'summary': summary, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
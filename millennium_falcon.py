@@ -5,17 +5,29 @@ from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
 import networkx as nx
 import matplotlib.pyplot as plt
-from matplotlib.patches import Circle
-import matplotlib.animation as animation
 import numpy as np
+from mission_rendering import draw_mission
+from mission_solvers import DEFAULT_MEMORY_BUDGET, SOLVERS, Chains, MissionProblem, Solution, fly, reduce_routes
 
 
 class MillenniumFalcon:
-    def __init__(self, config_file: str):
+    def __init__(self, config_file: str, solver: str = "dfs", memory_budget: int = DEFAULT_MEMORY_BUDGET):
         self.routes: Dict[str, Dict[str, int]] = {}
         self.autonomy: int = 0
         self.departure: str = ""
         self.arrival: str = ""
+
+        # "dfs" enumerates every path; the other solvers (see mission_solvers.SOLVERS) only find the best one
+        if solver != "dfs" and solver not in SOLVERS:
+            raise ValueError(f"Unknown solver: {solver}")
+        self.solver: str = solver
+        self.memory_budget: int = memory_budget
+
+        # Itinerary behind the odds of the last calculate_odds* call, handed to the visualizers, and the
+        # empire intelligence (countdown and bounty hunters) it was solved for
+        self.best_path: Optional[List[Tuple[str, int, str]]] = None
+        self.countdown: Optional[int] = None
+        self.bounty_hunters: Set[Tuple[str, int]] = set()
         
         try:
             db_path = self.load_config_data(config_file)
@@ -84,7 +96,8 @@ class MillenniumFalcon:
         except sqlite3.Error as e:
             raise Exception(f"Database error: {e}")
             
-    def _get_possible_paths(self, countdown: int) -> List[List[Tuple[str, int, str]]]:
+    def _get_possible_paths(self, countdown: int, routes: Optional[Dict[str, Dict[str, int]]] = None,
+                            chains: Optional[Chains] = None) -> List[List[Tuple[str, int, str]]]:
         """
         This method generates all possible paths for the mission given a countdown value.
         This method uses a depth-first search (DFS) algorithm to explore all potential routes 
@@ -103,7 +116,14 @@ class MillenniumFalcon:
         time is within the remaining fuel, it directly adds the travel action to the path and 
         calls DFS for the next planet. After exploring each path, it backtracks by removing the 
         last actions and updating the visited set.
+
+        By default the full `self.routes` are searched. When `routes` and `chains` from `reduce_routes`
+        are given, the search runs on the reduced universe and merged corridors are flown hop by hop, so
+        the paths still list every planet and refuel stop along the way.
         """
+        if routes is None:
+            routes = self.routes
+        chains = chains or {}
         paths: List[List[Tuple[str, int, str]]] = []  # (planet, day, action)
         visited: Set[Tuple[str, int]] = set()
         
@@ -115,37 +135,89 @@ class MillenniumFalcon:
                 paths.append(path[:])
                 return
                 
-            for next_planet, travel_time in self.routes[current].items():
-                if travel_time > fuel:
-                    # Need to refuel first
-                    refuel_day = time_spent + 1
-                    travel_day = refuel_day + travel_time
-                    new_fuel = self.autonomy - travel_time
-                    
-                    if travel_day <= countdown and (next_planet, travel_day) not in visited:
-                        visited.add((next_planet, travel_day))
-                        # Add both the refuel day and travel day
-                        path.append((current, refuel_day, "REFUEL"))
-                        path.append((current, travel_day - travel_time, "WAIT"))  # Day before travel
-                        path.append((next_planet, travel_day, "TRAVEL"))
-                        dfs(next_planet, path, travel_day, new_fuel)
-                        path.pop()
-                        path.pop()
-                        path.pop()
-                        visited.remove((next_planet, travel_day))
-                else:
-                    new_time = time_spent + travel_time
-                    new_fuel = fuel - travel_time
-                    if new_time <= countdown and (next_planet, new_time) not in visited:
-                        visited.add((next_planet, new_time))
-                        path.append((next_planet, new_time, "TRAVEL"))
-                        dfs(next_planet, path, new_time, new_fuel)
-                        path.pop()
-                        visited.remove((next_planet, new_time))
+            for next_planet, travel_time in routes[current].items():
+                # Refuel (REFUEL and WAIT on the same day) before any hop the remaining fuel does not cover
+                hops = chains.get((current, next_planet), [(next_planet, travel_time)])
+                steps, travel_day, new_fuel = fly(current, hops, time_spent, fuel, self.autonomy)
+                
+                if travel_day <= countdown and (next_planet, travel_day) not in visited:
+                    visited.add((next_planet, travel_day))
+                    path.extend(steps)
+                    dfs(next_planet, path, travel_day, new_fuel)
+                    del path[-len(steps):]
+                    visited.remove((next_planet, travel_day))
         
         dfs(self.departure, [(self.departure, 0, "START")], 0, self.autonomy)
         return paths
 
+    def _solve_best_path(self, countdown: int, bounty_hunters: Set[Tuple[str, int]],
+                         routes: Dict[str, Dict[str, int]],
+                         chains: Chains) -> Optional[Tuple[int, List[Tuple[str, int, str]]]]:
+        """
+        Run the configured solver backend (see `mission_solvers`) on the reduced routes instead of enumerating
+        every path. Returns the fewest bounty hunter encounters and the itinerary achieving them, or None when
+        the arrival planet cannot be reached within the countdown.
+        """
+        problem = MissionProblem(routes, self.autonomy, self.departure, self.arrival,
+                                 countdown, bounty_hunters, chains)
+        if self.solver == "rolling":
+            return SOLVERS[self.solver](problem, self.memory_budget)
+        return SOLVERS[self.solver](problem)
+
+    def _prepare_mission(self, countdown: int,
+                         bounty_hunters: Set[Tuple[str, int]]) -> Tuple[Dict[str, Dict[str, int]], Chains, Solution]:
+        """
+        Common start of calculate_odds and calculate_odds_with_debug: remember the empire data being solved,
+        reduce the routes and, for any solver but "dfs", find the best itinerary and store it in
+        `self.best_path`. Returns the reduced routes and chains (which the DFS then searches) and the solver's
+        (encounters, itinerary), None for "dfs" or when the arrival cannot be reached.
+        """
+        self.best_path = None
+        self.countdown, self.bounty_hunters = countdown, bounty_hunters
+        routes, chains = reduce_routes(self.routes, self.departure, self.arrival, countdown, bounty_hunters)
+        solution = None
+        if self.solver != "dfs":
+            solution = self._solve_best_path(countdown, bounty_hunters, routes, chains)
+            if solution is not None:
+                self.best_path = solution[1]
+        return routes, chains, solution
+
+    def _describe_path(self, path: List[Tuple[str, int, str]],
+                       bounty_hunters: Set[Tuple[str, int]]) -> Tuple[List[str], int]:
+        """Debug lines for one path (movements, encounters, probability) and its bounty hunter encounter count."""
+        debug_info = []
+        debug_info.append("Day-by-day movement:")
+        for planet, day, action in path:
+            debug_info.append(f"  Day {day}: {action} at {planet}")
+            
+        # Check encounters with bounty hunters
+        encounters = []
+        for planet, day, action in path:
+            if (planet, day) in bounty_hunters:
+                encounters.append(f"  - Day {day}: Bounty hunter encounter on {planet} during {action}")
+        
+        encounter_count = len(encounters)
+        
+        debug_info.append("\nBounty Hunter Encounters:")
+        if encounters:
+            debug_info.extend(encounters)
+            debug_info.append(f"Total encounters: {encounter_count}")
+        else:
+            debug_info.append("  None")
+            
+        if encounter_count == 0:
+            debug_info.append("\nNo bounty hunters - 100% success rate")
+            return debug_info, encounter_count
+            
+        # Calculate probability
+        success_probability = (0.9 ** encounter_count) * 100
+        
+        debug_info.append(f"\nProbability Calculation:")
+        debug_info.append(f"Number of encounters: {encounter_count}")
+        debug_info.append(f"Formula: (9/10)^{encounter_count} * 100")
+        debug_info.append(f"Success probability = {success_probability:.2f}%")
+        return debug_info, encounter_count
+
     def calculate_odds(self, empire_file: str) -> float:
         """
         Calculate the odds of successfully navigating the Millennium Falcon without being captured by bounty hunters.
@@ -166,7 +238,11 @@ class MillenniumFalcon:
         
         # pdb.set_trace() # dbg
 
-        possible_paths = self._get_possible_paths(countdown)
+        routes, chains, solution = self._prepare_mission(countdown, bounty_hunters)
+        if self.solver != "dfs":
+            return 0.0 if solution is None else (0.9 ** solution[0]) * 100
+
+        possible_paths = self._get_possible_paths(countdown, routes, chains)
         print(possible_paths)
         if not possible_paths:
             return 0.0
@@ -182,6 +258,7 @@ class MillenniumFalcon:
             encounter_count = len(encounters)
                 
             if encounter_count == 0:
+                self.best_path = path
                 return 100.0
                 
             # Calculate probability
@@ -189,6 +266,7 @@ class MillenniumFalcon:
             
             if success_probability > best_probability:
                 best_probability = success_probability
+                self.best_path = path
         
         return best_probability
 
@@ -217,9 +295,21 @@ class MillenniumFalcon:
         debug_info.append("Bounty Hunters:")
         for hunter in empire_data['bounty_hunters']:
             debug_info.append(f"  - Planet: {hunter['planet']}, Day: {hunter['day']}")
+        routes, chains, solution = self._prepare_mission(countdown, bounty_hunters)
+        debug_info.append(f"Planets kept after preprocessing: {len(routes)} of {len(self.routes)} "
+                          f"({len(chains) // 2} corridors merged)")
         debug_info.append("\n")
+
+        if self.solver != "dfs":
+            if solution is None:
+                return 0.0, "No possible paths found"
+            encounter_count, path = solution
+            debug_info.append(f"\nBest path ({self.solver} solver):")
+            path_debug, _ = self._describe_path(path, bounty_hunters)
+            debug_info.extend(path_debug)
+            return (0.9 ** encounter_count) * 100, "\n".join(debug_info)
         
-        possible_paths = self._get_possible_paths(countdown)
+        possible_paths = self._get_possible_paths(countdown, routes, chains)
         
         if not possible_paths:
             return 0.0, "No possible paths found"
@@ -229,69 +319,26 @@ class MillenniumFalcon:
         
         for path_index, path in enumerate(possible_paths, 1):
             debug_info.append(f"\nPath {path_index}:")
-            debug_info.append("Day-by-day movement:")
-            for planet, day, action in path:
-                debug_info.append(f"  Day {day}: {action} at {planet}")
-                
-            # Check encounters with bounty hunters
-            encounters = []
-            for planet, day, action in path:
-                if (planet, day) in bounty_hunters:
-                    encounters.append(f"  - Day {day}: Bounty hunter encounter on {planet} during {action}")
-            
-            encounter_count = len(encounters)
-            
-            debug_info.append("\nBounty Hunter Encounters:")
-            if encounters:
-                debug_info.extend(encounters)
-                debug_info.append(f"Total encounters: {encounter_count}")
-            else:
-                debug_info.append("  None")
-                
+            path_debug, encounter_count = self._describe_path(path, bounty_hunters)
+            debug_info.extend(path_debug)
+
             if encounter_count == 0:
-                debug_info.append("\nNo bounty hunters - 100% success rate")
+                self.best_path = path
                 return 100.0, "\n".join(debug_info)
                 
             # Calculate probability
             success_probability = (0.9 ** encounter_count) * 100
             
-            debug_info.append(f"\nProbability Calculation:")
-            debug_info.append(f"Number of encounters: {encounter_count}")
-            debug_info.append(f"Formula: (9/10)^{encounter_count} * 100")
-            debug_info.append(f"Success probability = {success_probability:.2f}%")
-            
             if success_probability > best_probability:
                 best_probability = success_probability
+                self.best_path = path
                 best_path_debug = "\n".join(debug_info)
         
         return best_probability, best_path_debug
 
 
-    def visualize_mission_dynamic(self, empire_file: str, odds: float) -> None:
-        """Create an interactive visual representation of the mission with dynamic node labeling."""
-        # Create figure with extra space at bottom for timeline
-        fig = plt.figure(figsize=(15, 12))
-        main_ax = plt.subplot2grid((5, 1), (0, 0), rowspan=4)
-        timeline_ax = plt.subplot2grid((5, 1), (4, 0))
-        
-        # Create graph and add planet nodes at fixed positions
-        G = nx.Graph()
-        planet_positions = {
-            'Tatooine': (0, 0),
-            'Dagobah': (2, 1),
-            'Hoth': (4, 1),
-            'Endor': (6, 0)
-        }
-        
-        for planet, pos in planet_positions.items():
-            G.add_node(planet, pos=pos, name=planet)
-        
-        # Add edges (routes) from self.routes
-        for origin in self.routes:
-            for dest, time in self.routes[origin].items():
-                G.add_edge(origin, dest, weight=time)
-        
-        # Load empire data and bounty hunter information
+    def load_empire_data(self, empire_file: str) -> Tuple[int, Set[Tuple[str, int]]]:
+        """Countdown and (planet, day) bounty hunter sightings from an empire intelligence file."""
         with open(empire_file, 'r') as f:
             empire_data = json.load(f)
         
@@ -299,45 +346,35 @@ class MillenniumFalcon:
             (hunter['planet'], hunter['day']) 
             for hunter in empire_data['bounty_hunters']
         }
+        return empire_data['countdown'], bounty_hunters
+
+    def _solved_empire_data(self, empire_file: str) -> Tuple[int, Set[Tuple[str, int]]]:
+        """
+        Countdown and bounty hunters the last calculate_odds* call solved for, so the itinerary is drawn against
+        the same empire data; `empire_file` is only read when nothing has been solved yet.
+        """
+        if self.countdown is None:
+            return self.load_empire_data(empire_file)
+        return self.countdown, self.bounty_hunters
+
+    def visualize_mission_dynamic(self, empire_file: str, odds: float,
+                                  best_path: Optional[List[Tuple[str, int, str]]]) -> None:
+        """
+        Create an interactive visual representation of the mission with dynamic node labeling.
+        `best_path` is the itinerary already found by calculate_odds* (see `self.best_path`).
+        """
+        countdown, bounty_hunters = self._solved_empire_data(empire_file)
+
+        # Create figure with extra space at bottom for timeline
+        fig = plt.figure(figsize=(15, 12))
+        main_ax = plt.subplot2grid((5, 1), (0, 0), rowspan=4)
+        timeline_ax = plt.subplot2grid((5, 1), (4, 0))
         
-        # Determine best path based on mission countdown and bounty hunter encounters
-        possible_paths = self._get_possible_paths(empire_data['countdown'])
-        best_path = None
-        best_probability = 0.0
-        for path in possible_paths:
-            encounters = sum(1 for planet, day, _ in path if (planet, day) in bounty_hunters)
-            probability = (0.9 ** encounters) * 100
-            if probability > best_probability:
-                best_probability = probability
-                best_path = path
-
-        # Set title of the main mission map
-        main_ax.set_title(f"Millennium Falcon Mission Map\nSuccess Probability: {odds:.1f}%", pad=20)
+        G, planets, nodes_collection = draw_mission(main_ax, timeline_ax, self.routes, self.departure,
+                                                    self.arrival, countdown, bounty_hunters, best_path, odds,
+                                                    legend=False)
         pos = nx.get_node_attributes(G, 'pos')
         
-        # Draw basic graph structure on the main axis
-        nx.draw_networkx_edges(G, pos, edge_color='gray', width=1, alpha=0.5, ax=main_ax)
-        nx.draw_networkx_edge_labels(G, pos,
-                                    edge_labels=nx.get_edge_attributes(G, 'weight'),
-                                    ax=main_ax)
-        # Capture the nodes collection to allow for dynamic interactivity
-        nodes_collection = nx.draw_networkx_nodes(G, pos, node_color='lightblue', node_size=1000, ax=main_ax)
-        nx.draw_networkx_labels(G, pos, ax=main_ax)
-        
-        # Highlight the best path, if available
-        if best_path:
-            path_edges = []
-            for i in range(len(best_path) - 1):
-                current = best_path[i][0]
-                next_planet = best_path[i+1][0]
-                if (current, next_planet) in G.edges() or (next_planet, current) in G.edges():
-                    path_edges.append((current, next_planet))
-            nx.draw_networkx_edges(G, pos, edgelist=path_edges, edge_color='green', width=2, ax=main_ax)
-        
-            # Highlight planets with bounty hunter encounters
-            hunter_planets = {planet for planet, day in bounty_hunters}
-            nx.draw_networkx_nodes(G, pos, nodelist=hunter_planets, node_color='red', node_size=1000, ax=main_ax)
-        
         # Create a dynamic annotation for nodes (planets) on the mission map
         annot = main_ax.annotate("", xy=(0, 0), xytext=(20, 20),
                                 textcoords="offset points", bbox=dict(boxstyle="round", fc="w"),
@@ -347,12 +384,12 @@ class MillenniumFalcon:
         # Update annotation text and position based on hovered node.
         def update_annot(ind):
             index = ind["ind"][0]
-            # Get the corresponding planet based on the order of nodes in G.nodes
-            node = list(G.nodes)[index]
+            # Get the corresponding planet based on the order of the drawn nodes
+            node = planets[index]
             annot.xy = pos[node]
             text = f"Planet: {node}"
             # Optionally show bounty hunter days if present on this planet
-            hunter_days = [str(day) for (planet, day) in bounty_hunters if planet == node]
+            hunter_days = [str(day) for (planet, day) in sorted(bounty_hunters) if planet == node]
             if hunter_days:
                 text += f"\nBounty Hunter(s) on Day(s): {', '.join(hunter_days)}"
             annot.set_text(text)
@@ -373,139 +410,27 @@ class MillenniumFalcon:
         
         fig.canvas.mpl_connect("motion_notify_event", hover)
         
-        # Configure timeline axis
-        timeline_ax.set_title('Mission Timeline')
-        timeline_ax.set_xlim(-0.5, empire_data['countdown'] + 0.5)
-        timeline_ax.set_ylim(0, 1)
-        timeline_ax.set_xticks(range(empire_data['countdown'] + 1))
-        timeline_ax.set_xticklabels([f'Day {i}' for i in range(empire_data['countdown'] + 1)])
-        timeline_ax.set_yticks([])
-        
-        # Draw timeline events
-        if best_path:
-            for planet, day, action in best_path:
-                timeline_ax.text(day, 0.2, f'{planet}\n({action})', 
-                                ha='center', va='bottom', color='green')
-            for planet, day in bounty_hunters:
-                timeline_ax.text(day, 0.7, f'Hunter@{planet}', 
-                                ha='center', va='bottom', color='red', rotation=45)
-        
-        # Add day markers as circles
-        for i in range(empire_data['countdown'] + 1):
-            timeline_ax.add_patch(Circle((i, 0.5), 0.1, color='lightgray'))
-        
         plt.tight_layout()
         plt.show()
         
 
-    def visualize_mission(self, empire_file: str, odds: float) -> None:
-        """Create a visual representation of the mission"""
+    def visualize_mission(self, empire_file: str, odds: float,
+                          best_path: Optional[List[Tuple[str, int, str]]]) -> None:
+        """
+        Create a visual representation of the mission.
+        `best_path` is the itinerary already found by calculate_odds* (see `self.best_path`).
+        """
+        countdown, bounty_hunters = self._solved_empire_data(empire_file)
+
         # Create figure with extra space at bottom for timeline
-        fig = plt.figure(figsize=(15, 12))
+        plt.figure(figsize=(15, 12))
         
         # Create main graph axes with space at bottom for timeline
         main_ax = plt.subplot2grid((5, 1), (0, 0), rowspan=4)
         timeline_ax = plt.subplot2grid((5, 1), (4, 0))
         
-        # Create graph
-        G = nx.Graph()
-        
-        # Add nodes (planets)
-        planet_positions = {
-            'Tatooine': (0, 0),
-            'Dagobah': (2, 1),
-            'Hoth': (4, 1),
-            'Endor': (6, 0)
-        }
-        
-        # Add nodes with positions
-        for planet, pos in planet_positions.items():
-            G.add_node(planet, pos=pos, name=planet)
-        
-        # Add edges (routes)
-        for origin in self.routes:
-            for dest, time in self.routes[origin].items():
-                G.add_edge(origin, dest, weight=time)
-        
-        # Load empire data
-        with open(empire_file, 'r') as f:
-            empire_data = json.load(f)
-        
-        bounty_hunters = {
-            (hunter['planet'], hunter['day']) 
-            for hunter in empire_data['bounty_hunters']
-        }
-        
-        # Get the best path
-        possible_paths = self._get_possible_paths(empire_data['countdown'])
-        best_path = None
-        best_probability = 0.0
-        
-        for path in possible_paths:
-            encounters = sum(1 for planet, day, _ in path if (planet, day) in bounty_hunters)
-            probability = (0.9 ** encounters) * 100
-            if probability > best_probability:
-                best_probability = probability
-                best_path = path
-
-        # Draw on main axes
-        main_ax.set_title(f"Millennium Falcon Mission Map\nSuccess Probability: {odds:.1f}%", pad=20)
-        
-        pos = nx.get_node_attributes(G, 'pos')
-        
-        # Draw basic graph structure
-        nx.draw_networkx_edges(G, pos, edge_color='gray', width=1, alpha=0.5, ax=main_ax)
-        nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'))
-        nx.draw_networkx_nodes(G, pos, node_color='lightblue', node_size=1000, ax=main_ax)
-        nx.draw_networkx_labels(G, pos)
-        
-        # Highlight the path
-        if best_path:
-            path_edges = []
-            for i in range(len(best_path)-1):
-                current = best_path[i][0]
-                next_planet = best_path[i+1][0]
-                if (current, next_planet) in G.edges() or (next_planet, current) in G.edges():
-                    path_edges.append((current, next_planet))
-            
-            nx.draw_networkx_edges(G, pos, edgelist=path_edges, edge_color='green', width=2, ax=main_ax)
-            
-            # Highlight planets with bounty hunters
-            hunter_planets = {planet for planet, day in bounty_hunters}
-            nx.draw_networkx_nodes(G, pos, nodelist=hunter_planets, node_color='red', node_size=1000, ax=main_ax)
-        
-        # Add legend to main graph
-        legend_elements = [
-            plt.Line2D([0], [0], color='gray', label='Route'),
-            plt.Line2D([0], [0], color='green', label='Best Path'),
-            plt.scatter([0], [0], c='lightblue', s=100, label='Planet'),
-            plt.scatter([0], [0], c='red', s=100, label='Bounty Hunters')
-        ]
-        main_ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(1, 1))
-        
-        # Configure timeline axis
-        timeline_ax.set_title('Mission Timeline')
-        timeline_ax.set_xlim(-0.5, empire_data['countdown'] + 0.5)
-        timeline_ax.set_ylim(0, 1)
-        timeline_ax.set_xticks(range(empire_data['countdown'] + 1))
-        timeline_ax.set_xticklabels([f'Day {i}' for i in range(empire_data['countdown'] + 1)])
-        timeline_ax.set_yticks([])
-        
-        # Draw timeline events
-        if best_path:
-            # Plot path events
-            for planet, day, action in best_path:
-                timeline_ax.text(day, 0.2, f'{planet}\n({action})', 
-                            ha='center', va='bottom', color='green')
-            
-            # Plot bounty hunter events
-            for planet, day in bounty_hunters:
-                timeline_ax.text(day, 0.7, f'Hunter@{planet}', 
-                            ha='center', va='bottom', color='red', rotation=45)
-        
-        # Add day markers
-        for i in range(empire_data['countdown'] + 1):
-            timeline_ax.add_patch(Circle((i, 0.5), 0.1, color='lightgray'))
+        draw_mission(main_ax, timeline_ax, self.routes, self.departure, self.arrival, countdown,
+                     bounty_hunters, best_path, odds)
         
         # Adjust layout to prevent overlapping
         plt.tight_layout()
@@ -0,0 +1,208 @@
+"""
+Drawing of the mission map and timeline, shared by the interactive visualizers of `MillenniumFalcon` and the
+headless renderer used by the Flask app.
+
+The drawing reuses the itinerary the solver already found instead of searching again. Planet positions are
+computed once per universe and cached: at most `MAX_LAYOUT_PLANETS` of the best connected planets go through
+the force-directed layout, the others are placed next to their already placed neighbours. Large galaxies are
+decimated when drawn, keeping the itinerary, the departure, the arrival and the hunted planets first and
+filling up to `MAX_DRAWN_PLANETS` with the best connected ones.
+"""
+import hashlib
+import math
+import random
+import threading
+from collections import OrderedDict, deque
+from io import BytesIO
+from typing import Dict, List, Optional, Set, Tuple
+
+import networkx as nx
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import Circle
+
+Itinerary = List[Tuple[str, int, str]]  # (planet, day, action)
+Position = Tuple[float, float]
+
+MAX_LAYOUT_PLANETS = 300
+MAX_DRAWN_PLANETS = 150
+MAX_LABELLED_PLANETS = 40
+MAX_TIMELINE_TICKS = 15
+LAYOUT_CACHE_SIZE = 16
+
+_layouts: "OrderedDict[str, Dict[str, Position]]" = OrderedDict()
+_layouts_lock = threading.Lock()
+
+
+def universe_key(routes: Dict[str, Dict[str, int]]) -> str:
+    """Stable fingerprint of a universe, used to cache its layout."""
+    digest = hashlib.sha1()
+    for origin in sorted(routes):
+        for destination, travel_time in sorted(routes[origin].items()):
+            digest.update(f"{origin}\0{destination}\0{travel_time}\n".encode())
+    return digest.hexdigest()
+
+
+def _compute_layout(routes: Dict[str, Dict[str, int]]) -> Dict[str, Position]:
+    """Force-directed layout of the best connected planets, the rest placed around their neighbours."""
+    by_degree = sorted(routes, key=lambda planet: (-len(routes[planet]), planet))
+    if not by_degree:
+        return {}
+    backbone = by_degree[:MAX_LAYOUT_PLANETS]
+    graph = nx.Graph()
+    graph.add_nodes_from(backbone)
+    members = set(backbone)
+    for origin in backbone:
+        graph.add_edges_from((origin, destination) for destination in routes[origin] if destination in members)
+    positions: Dict[str, Position] = {
+        planet: (float(x), float(y)) for planet, (x, y) in nx.spring_layout(graph, seed=42).items()
+    }
+
+    rng = random.Random(42)
+    spread = 1.0 / math.sqrt(len(backbone))
+    queue = deque(backbone)
+    while queue:
+        planet = queue.popleft()
+        for neighbour in routes[planet]:
+            if neighbour in positions:
+                continue
+            placed = [positions[n] for n in routes[neighbour] if n in positions]
+            x = sum(p[0] for p in placed) / len(placed) + rng.uniform(-spread, spread)
+            y = sum(p[1] for p in placed) / len(placed) + rng.uniform(-spread, spread)
+            positions[neighbour] = (x, y)
+            queue.append(neighbour)
+    for planet in by_degree:
+        if planet not in positions:  # planets with no route into the laid out part
+            positions[planet] = (rng.uniform(-1, 1), rng.uniform(-1, 1))
+    return positions
+
+
+def universe_layout(routes: Dict[str, Dict[str, int]]) -> Dict[str, Position]:
+    """Planet positions for `routes`, computed on first use and then served from a small per-universe cache."""
+    key = universe_key(routes)
+    with _layouts_lock:
+        if key in _layouts:
+            _layouts.move_to_end(key)
+            return _layouts[key]
+    positions = _compute_layout(routes)
+    with _layouts_lock:
+        _layouts[key] = positions
+        while len(_layouts) > LAYOUT_CACHE_SIZE:
+            _layouts.popitem(last=False)
+    return positions
+
+
+def _planets_to_draw(routes: Dict[str, Dict[str, int]], departure: str, arrival: str,
+                     best_path: Optional[Itinerary], hunter_planets: Set[str]) -> List[str]:
+    """Every planet for small universes; otherwise the itinerary and its ends, hunted planets, then hubs."""
+    if len(routes) <= MAX_DRAWN_PLANETS:
+        return list(routes)
+    chosen = dict.fromkeys(planet for planet in [departure, arrival] if planet in routes)
+    chosen.update(dict.fromkeys(planet for planet, _, _ in best_path or []))
+    chosen.update(dict.fromkeys(sorted(hunter_planets & set(routes))))
+    for planet in sorted(routes, key=lambda p: (-len(routes[p]), p)):
+        if len(chosen) >= MAX_DRAWN_PLANETS:
+            break
+        chosen.setdefault(planet)
+    return list(chosen)
+
+
+def draw_mission(main_ax, timeline_ax, routes: Dict[str, Dict[str, int]], departure: str,
+                 arrival: str, countdown: int, bounty_hunters: Set[Tuple[str, int]],
+                 best_path: Optional[Itinerary], odds: float, legend: bool = True):
+    """
+    Draw the mission map on `main_ax` and the timeline on `timeline_ax`. Returns the drawn graph (with a 'pos'
+    attribute per planet), the drawn planets in node order and the node collection, so callers can add
+    interactivity.
+    """
+    hunter_planets = {planet for planet, _ in bounty_hunters}
+    positions = universe_layout(routes)
+    planets = _planets_to_draw(routes, departure, arrival, best_path, hunter_planets)
+
+    G = nx.Graph()
+    for planet in planets:
+        G.add_node(planet, pos=positions[planet], name=planet)
+    drawn = set(planets)
+    for origin in planets:
+        for dest, time in routes[origin].items():
+            if dest in drawn:
+                G.add_edge(origin, dest, weight=time)
+    pos = nx.get_node_attributes(G, 'pos')
+    node_size = 1000 if len(planets) <= MAX_LABELLED_PLANETS else 120
+
+    main_ax.set_title(f"Millennium Falcon Mission Map\nSuccess Probability: {odds:.1f}%", pad=20)
+    nx.draw_networkx_edges(G, pos, edge_color='gray', width=1, alpha=0.5, ax=main_ax)
+    if G.number_of_edges() <= MAX_LABELLED_PLANETS:
+        nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=main_ax)
+    nodes_collection = nx.draw_networkx_nodes(G, pos, nodelist=planets, node_color='lightblue',
+                                              node_size=node_size, ax=main_ax)
+
+    path_planets = [planet for planet, _, _ in best_path or []]
+    if best_path:
+        # Highlight the best path
+        path_edges = []
+        for current, next_planet in zip(path_planets, path_planets[1:]):
+            if current != next_planet and G.has_edge(current, next_planet):
+                path_edges.append((current, next_planet))
+        nx.draw_networkx_edges(G, pos, edgelist=path_edges, edge_color='green', width=2, ax=main_ax)
+
+        # Highlight planets with bounty hunters
+        nx.draw_networkx_nodes(G, pos, nodelist=[p for p in planets if p in hunter_planets], node_color='red',
+                               node_size=node_size, ax=main_ax)
+
+    if len(planets) <= MAX_LABELLED_PLANETS:
+        nx.draw_networkx_labels(G, pos, ax=main_ax)
+    else:
+        labelled = dict.fromkeys(path_planets + [departure, arrival])
+        nx.draw_networkx_labels(G, pos, labels={p: p for p in labelled if p in pos}, font_size=8, ax=main_ax)
+
+    if legend:
+        legend_elements = [
+            Line2D([0], [0], color='gray', label='Route'),
+            Line2D([0], [0], color='green', label='Best Path'),
+            Line2D([0], [0], marker='o', color='w', markerfacecolor='lightblue', markersize=10, label='Planet'),
+            Line2D([0], [0], marker='o', color='w', markerfacecolor='red', markersize=10, label='Bounty Hunters')
+        ]
+        main_ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(1, 1))
+
+    # Configure timeline axis, with at most MAX_TIMELINE_TICKS day markers for long countdowns
+    step = max(1, math.ceil((countdown + 1) / MAX_TIMELINE_TICKS))
+    ticks = range(0, countdown + 1, step)
+    timeline_ax.set_title('Mission Timeline')
+    timeline_ax.set_xlim(-0.5, countdown + 0.5)
+    timeline_ax.set_ylim(0, 1)
+    timeline_ax.set_xticks(list(ticks))
+    timeline_ax.set_xticklabels([f'Day {i}' for i in ticks])
+    timeline_ax.set_yticks([])
+
+    if best_path:
+        for planet, day, action in best_path:
+            timeline_ax.text(day, 0.2, f'{planet}\n({action})', ha='center', va='bottom', color='green')
+        shown = set(path_planets) if len(bounty_hunters) > MAX_TIMELINE_TICKS else drawn
+        for planet, day in bounty_hunters:
+            if planet in shown:
+                timeline_ax.text(day, 0.7, f'Hunter@{planet}', ha='center', va='bottom', color='red', rotation=45)
+
+    for i in ticks:
+        timeline_ax.add_patch(Circle((i, 0.5), 0.1, color='lightgray'))
+
+    return G, planets, nodes_collection
+
+
+def render_mission(routes: Dict[str, Dict[str, int]], departure: str, arrival: str, countdown: int,
+                   bounty_hunters: Set[Tuple[str, int]], best_path: Optional[Itinerary], odds: float,
+                   fmt: str = "png") -> bytes:
+    """
+    Render the mission to PNG or SVG bytes without a display. Uses a standalone `Figure` rather than pyplot,
+    so it can run on a background worker thread; matplotlib is not thread safe, so only one render may run at
+    a time.
+    """
+    fig = Figure(figsize=(15, 12))
+    grid = fig.add_gridspec(5, 1)
+    main_ax = fig.add_subplot(grid[0:4, 0])
+    timeline_ax = fig.add_subplot(grid[4, 0])
+    draw_mission(main_ax, timeline_ax, routes, departure, arrival, countdown, bounty_hunters, best_path, odds)
+    fig.tight_layout()
+    buffer = BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.getvalue()
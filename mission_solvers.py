@@ -0,0 +1,724 @@
+"""
+Solver backends for the Millennium Falcon onboard computer.
+
+Every backend answers the same question as `MillenniumFalcon._get_possible_paths` followed by the scoring
+loop in `calculate_odds`: which itinerary reaches the arrival planet within the countdown while meeting the
+fewest bounty hunters. They follow the same travel rules as the depth-first search: the ship jumps straight
+on when it has enough fuel, otherwise it spends one day refuelling (logged as REFUEL and WAIT) before the jump,
+and the mission ends as soon as the arrival planet is reached. Instead of enumerating every path, they return
+only the minimum encounter count and the itinerary that achieves it.
+
+`reduce_routes` shrinks the universe before any backend runs: planets that cannot lie on a path within the
+countdown are dropped, and hunter-free corridors are merged into single multi-hop routes that `fly` expands
+back into day-by-day itineraries.
+"""
+import heapq
+import math
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+Itinerary = List[Tuple[str, int, str]]  # (planet, day, action)
+Chains = Dict[Tuple[str, str], List[Tuple[str, int]]]  # (origin, destination) -> [(planet, travel_time), ...]
+Solution = Optional[Tuple[int, Itinerary]]  # (encounters, itinerary), None when the arrival is unreachable
+
+# Encounter counts are stored as int32; anything at or above INF is an unreachable state.
+INF = 2 ** 30
+
+# Default memory budget for the rolling-window solver, in bytes.
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+def fly(origin: str, hops: List[Tuple[str, int]], day: int, fuel: int,
+        autonomy: int) -> Tuple[Itinerary, int, int]:
+    """
+    Fly from `origin` through each (planet, travel_time) hop in turn, refuelling for a day before any hop the
+    remaining fuel does not cover. Returns the itinerary entries, the arrival day and the fuel left.
+    """
+    entries: Itinerary = []
+    for planet, travel_time in hops:
+        if travel_time > fuel:
+            day += 1
+            entries.append((origin, day, "REFUEL"))
+            entries.append((origin, day, "WAIT"))
+            fuel = autonomy - travel_time
+        else:
+            fuel -= travel_time
+        day += travel_time
+        entries.append((planet, day, "TRAVEL"))
+        origin = planet
+    return entries, day, fuel
+
+
+class MissionProblem:
+    """
+    Planet-indexed view of the routes, the ship and the empire intelligence shared by the solver backends.
+    Planets are numbered in sorted order, routes become directed edges (none leave the arrival planet, since
+    the mission stops there) and bounty hunter sightings are grouped by day for constant time lookups.
+    """
+
+    def __init__(self, routes: Dict[str, Dict[str, int]], autonomy: int, departure: str, arrival: str,
+                 countdown: int, bounty_hunters: Set[Tuple[str, int]], chains: Optional[Chains] = None):
+        chains = chains or {}
+        self.planets: List[str] = sorted(set(routes) | {departure, arrival})
+        self.index: Dict[str, int] = {planet: i for i, planet in enumerate(self.planets)}
+        self.autonomy = autonomy
+        self.countdown = countdown
+        self.departure = self.index[departure]
+        self.arrival = self.index[arrival]
+
+        # Each route is a tuple of hop travel times: one hop, or several for a corridor merged by reduce_routes
+        self.edges: List[Tuple[int, int, Tuple[int, ...]]] = []
+        self.outgoing: Dict[int, List[Tuple[int, Tuple[int, ...]]]] = {}
+        self.incoming: Dict[int, List[Tuple[int, Tuple[int, ...]]]] = {}
+        self.hops: Dict[Tuple[int, int], List[Tuple[str, int]]] = {}
+        for origin, destinations in routes.items():
+            if origin == arrival:
+                continue
+            for destination, travel_time in destinations.items():
+                u, v = self.index[origin], self.index[destination]
+                hops = chains.get((origin, destination), [(destination, travel_time)])
+                times = tuple(t for _, t in hops)
+                self.edges.append((u, v, times))
+                self.outgoing.setdefault(u, []).append((v, times))
+                self.incoming.setdefault(v, []).append((u, times))
+                self.hops[(u, v)] = hops
+        # Longest a single-hop route can take, refuel day included. Merged corridors are left out: the rolling
+        # solver keeps their arrivals outside its ring buffer, so its window is the same as before reduce_routes
+        self.max_jump_days = max((times[0] + 1 for _, _, times in self.edges if len(times) == 1), default=0)
+        self.min_travel_time: Dict[int, int] = {
+            u: min(times[0] for _, times in routes_out) for u, routes_out in self.outgoing.items()
+        }
+        self._jump_groups: Dict[Tuple[int, int], List[Tuple[int, bool, np.ndarray, np.ndarray]]] = {}
+
+        self.hunters_by_day: Dict[int, Set[int]] = {}
+        for planet, day in bounty_hunters:
+            if planet in self.index:
+                self.hunters_by_day.setdefault(day, set()).add(self.index[planet])
+
+    def hunters(self, planet: int, day: int) -> int:
+        """1 if a bounty hunter is on `planet` on `day`, else 0."""
+        return 1 if planet in self.hunters_by_day.get(day, ()) else 0
+
+    def refuel_fuel(self, travel_time: int) -> int:
+        """Fuel left after refuelling and jumping `travel_time` days (never below zero)."""
+        return max(0, self.autonomy - travel_time)
+
+    def traverse(self, times: Tuple[int, ...], fuel: int) -> Tuple[int, int, bool]:
+        """
+        Days taken, fuel left and whether the ship refuelled at the origin when flying a route with `fuel`
+        units. Refuel stays inside a merged corridor meet no hunters, so only the origin stay is reported.
+        """
+        days = 0
+        refuelled_at_origin = False
+        for hop, travel_time in enumerate(times):
+            if travel_time > fuel:
+                days += 1
+                fuel = self.autonomy - travel_time
+                refuelled_at_origin = refuelled_at_origin or hop == 0
+            else:
+                fuel -= travel_time
+            days += travel_time
+        return days, max(0, fuel), refuelled_at_origin
+
+    def jump_groups(self, u: int, v: int) -> List[Tuple[int, bool, np.ndarray, np.ndarray]]:
+        """
+        For a multi-hop route, the starting fuel levels grouped by (days taken, refuelled at origin), each with
+        the matching fuel left on arrival, as (days, refuelled_at_origin, start_fuel, end_fuel) arrays.
+        """
+        if (u, v) not in self._jump_groups:
+            times = tuple(t for _, t in self.hops[(u, v)])
+            grouped: Dict[Tuple[int, bool], Tuple[List[int], List[int]]] = {}
+            for fuel in range(self.autonomy + 1):
+                days, left, refuelled_at_origin = self.traverse(times, fuel)
+                start, end = grouped.setdefault((days, refuelled_at_origin), ([], []))
+                start.append(fuel)
+                end.append(left)
+            self._jump_groups[(u, v)] = [
+                (days, refuelled_at_origin, np.array(start), np.array(end))
+                for (days, refuelled_at_origin), (start, end) in grouped.items()
+            ]
+        return self._jump_groups[(u, v)]
+
+    def itinerary(self, states: List[Tuple[int, int, int]]) -> Itinerary:
+        """Expand a sequence of (planet, day, fuel) states, one per route taken, into day-by-day entries."""
+        names = self.planets
+        path: Itinerary = [(names[self.departure], 0, "START")]
+        for (u, day, fuel), (v, _, _) in zip(states, states[1:]):
+            entries, _, _ = fly(names[u], self.hops[(u, v)], day, fuel, self.autonomy)
+            path.extend(entries)
+        return path
+
+    def useful_fuel(self, planet: int, day: int, fuel: int) -> int:
+        """
+        Smallest fuel level that behaves exactly like `fuel` for the rest of the mission. With at least
+        (countdown - day) units left the ship never refuels again, and with less than the shortest route out of
+        `planet` it must refuel before any jump, which resets the tank whatever was left.
+        """
+        fuel = min(fuel, self.countdown - day)
+        if planet == self.arrival or fuel < self.min_travel_time.get(planet, 0):
+            return 0
+        return fuel
+
+    def new_layer(self) -> np.ndarray:
+        """An empty (planet, fuel) layer of encounter counts."""
+        return np.full((len(self.planets), self.autonomy + 1), INF, dtype=np.int32)
+
+
+def _shortest_times(routes: Dict[str, Dict[str, int]], source: str) -> Dict[str, int]:
+    """Fewest travel days from `source` to every reachable planet, ignoring fuel (Dijkstra)."""
+    times = {source: 0}
+    queue = [(0, source)]
+    while queue:
+        time_spent, planet = heapq.heappop(queue)
+        if time_spent > times[planet]:
+            continue
+        for neighbour, travel_time in routes.get(planet, {}).items():
+            arrive = time_spent + travel_time
+            if arrive < times.get(neighbour, arrive + 1):
+                times[neighbour] = arrive
+                heapq.heappush(queue, (arrive, neighbour))
+    return times
+
+
+def reduce_routes(routes: Dict[str, Dict[str, int]], departure: str, arrival: str, countdown: int,
+                  bounty_hunters: Set[Tuple[str, int]]) -> Tuple[Dict[str, Dict[str, int]], Chains]:
+    """
+    Shrink the universe before solving, without changing the answer of any backend.
+
+    Planets whose shortest travel time from the departure plus shortest travel time to the arrival exceeds
+    the countdown cannot be on any path and are dropped. Chains of planets that have exactly two routes, never
+    see a bounty hunter and are neither the departure nor the arrival are then merged into a single route
+    between the chain ends, listed in the returned chains mapping as its (planet, travel_time) hops so that
+    `fly` can replay the refuel rules and expand the itinerary. Since the ship never waits voluntarily,
+    doubling back inside a chain is a way of passing time, so a chain is only merged when even the quickest
+    such detour could not fit in the countdown.
+    """
+    reversed_routes: Dict[str, Dict[str, int]] = {}
+    for origin, destinations in routes.items():
+        for destination, travel_time in destinations.items():
+            reversed_routes.setdefault(destination, {})[origin] = travel_time
+    from_departure = _shortest_times(routes, departure)
+    to_arrival = _shortest_times(reversed_routes, arrival)
+    unreachable = countdown + 1
+
+    def bound(start: str, days: int, end: str) -> int:
+        """Fewest days of a path reaching `start`, spending `days` and then going on from `end`."""
+        return from_departure.get(start, unreachable) + days + to_arrival.get(end, unreachable)
+
+    keep = {planet for planet in set(routes) | {departure, arrival} if bound(planet, 0, planet) <= countdown}
+    reduced = {
+        planet: {neighbour: t for neighbour, t in routes.get(planet, {}).items() if neighbour in keep}
+        for planet in keep | {departure, arrival}
+    }
+
+    hunted = {planet for planet, _ in bounty_hunters}
+
+    def is_link(planet: str) -> bool:
+        destinations = reduced.get(planet)
+        return (planet not in (departure, arrival) and planet not in hunted and destinations is not None
+                and len(destinations) == 2
+                and all(reduced[n].get(planet) == t for n, t in destinations.items()))
+
+    def follow(start: str, first: str) -> List[str]:
+        """Planets met walking from link `start` through `first` until the first planet that is not a link."""
+        walk = [first]
+        previous, current = start, first
+        while is_link(current) and current != start:
+            previous, current = current, next(n for n in reduced[current] if n != previous)
+            walk.append(current)
+        return walk
+
+    chains: Chains = {}
+    for planet in list(reduced):
+        if not is_link(planet):
+            continue
+        left, right = (follow(planet, n) for n in reduced[planet])
+        chain = left[::-1] + [planet] + right
+        start, end = chain[0], chain[-1]
+        if start == planet or start == end or end in reduced[start] or (start, end) in chains:
+            continue
+        times = [reduced[a][b] for a, b in zip(chain, chain[1:])]
+        total, shortest = sum(times), min(times)
+        if min(bound(start, 2 * times[0], start), bound(end, 2 * times[-1], end),
+               bound(start, total + 2 * shortest, end), bound(end, total + 2 * shortest, start)) <= countdown:
+            continue
+
+        reduced[start] = {(end if n == chain[1] else n): (total if n == chain[1] else t)
+                          for n, t in reduced[start].items()}
+        reduced[end] = {(start if n == chain[-2] else n): (total if n == chain[-2] else t)
+                        for n, t in reduced[end].items()}
+        for inner in chain[1:-1]:
+            del reduced[inner]
+        chains[(start, end)] = list(zip(chain[1:], times))
+        chains[(end, start)] = list(zip(chain[-2::-1], times[::-1]))
+    return reduced, chains
+
+
+def _relax_day(problem: MissionProblem, day: int, layer: np.ndarray, get_target: Callable[[int], np.ndarray],
+               defer: Optional[Callable[[int, int, np.ndarray, np.ndarray], None]] = None) -> None:
+    """
+    Push every state of `layer` (the states reached on `day`) along each route into the later layers. When
+    `defer` is given, arrivals over merged corridors go to defer(day, planet, fuels, encounters) instead.
+    """
+    autonomy, countdown = problem.autonomy, problem.countdown
+    live = layer.min(axis=1) < INF
+    for u, v, times in problem.edges:
+        if not live[u]:
+            continue
+        row = layer[u]
+
+        if len(times) > 1:
+            # Merged corridor: each group of starting fuel levels lands on the same day
+            for days, refuelled_at_origin, start, end in problem.jump_groups(u, v):
+                arrive = day + days
+                if arrive > countdown:
+                    continue
+                met = problem.hunters(v, arrive)
+                if refuelled_at_origin:
+                    met += 2 * problem.hunters(u, day + 1)
+                if defer is not None:
+                    defer(arrive, v, end, row[start] + met)
+                else:
+                    np.minimum.at(get_target(arrive)[v], end, row[start] + met)
+            continue
+        travel_time = times[0]
+
+        # Enough fuel left: jump straight away, burning `travel_time` units.
+        arrive = day + travel_time
+        if travel_time <= autonomy and arrive <= countdown:
+            target = get_target(arrive)[v, :autonomy + 1 - travel_time]
+            np.minimum(target, row[travel_time:] + problem.hunters(v, arrive), out=target)
+
+        # Not enough fuel: refuel for a day (REFUEL and WAIT both log that day), then jump.
+        arrive = day + 1 + travel_time
+        if arrive <= countdown:
+            best = int(row[:travel_time].min())
+            if best < INF:
+                cost = best + 2 * problem.hunters(u, day + 1) + problem.hunters(v, arrive)
+                target = get_target(arrive)
+                fuel = problem.refuel_fuel(travel_time)
+                if cost < target[v, fuel]:
+                    target[v, fuel] = cost
+
+
+def _backtrack(problem: MissionProblem, planet: int, day: int, fuel: int, cost: int,
+               get_layer: Callable[[int], Optional[np.ndarray]]) -> Itinerary:
+    """
+    Rebuild the itinerary ending in state (planet, day, fuel) with `cost` encounters. Each step looks for a
+    predecessor state whose encounter count plus the hunters met on the way equals the current count, so only
+    the complete layers for the predecessor days are needed, which `get_layer` provides.
+    """
+    states = [(planet, day, fuel)]
+    while day > 0:
+        for u, times in problem.incoming.get(planet, []):
+            previous = _find_predecessor(problem, u, times, planet, day, fuel, cost, get_layer)
+            if previous is not None:
+                day, fuel, cost = previous
+                planet = u
+                states.append((planet, day, fuel))
+                break
+        else:
+            raise RuntimeError(f"Could not rebuild itinerary at {problem.planets[planet]} on day {day}")
+    states.reverse()
+    return problem.itinerary(states)
+
+
+def _find_predecessor(problem: MissionProblem, u: int, times: Tuple[int, ...], planet: int, day: int,
+                      fuel: int, cost: int,
+                      get_layer: Callable[[int], Optional[np.ndarray]]) -> Optional[Tuple[int, int, int]]:
+    """(day, fuel, encounters) of a state on `u` whose route to `planet` produces the given state, if any."""
+    met = problem.hunters(planet, day)
+    if len(times) > 1:
+        for days, refuelled_at_origin, start, end in problem.jump_groups(u, planet):
+            prev_day = day - days
+            layer = get_layer(prev_day) if prev_day >= 0 else None
+            if layer is None:
+                continue
+            extra = met + (2 * problem.hunters(u, prev_day + 1) if refuelled_at_origin else 0)
+            candidates = start[end == fuel]
+            matches = candidates[layer[u, candidates] + extra == cost]
+            if matches.size:
+                return prev_day, int(matches[0]), int(layer[u, matches[0]])
+        return None
+
+    travel_time = times[0]
+    prev_day = day - travel_time
+    prev_fuel = fuel + travel_time
+    if prev_day >= 0 and prev_fuel <= problem.autonomy:
+        layer = get_layer(prev_day)
+        if layer is not None and layer[u, prev_fuel] + met == cost:
+            return prev_day, prev_fuel, int(layer[u, prev_fuel])
+
+    prev_day = day - 1 - travel_time
+    if prev_day >= 0 and fuel == problem.refuel_fuel(travel_time):
+        layer = get_layer(prev_day)
+        if layer is not None:
+            extra = 2 * problem.hunters(u, prev_day + 1) + met
+            matches = np.flatnonzero(layer[u, :travel_time] + extra == cost)
+            if matches.size:
+                return prev_day, int(matches[0]), int(layer[u, matches[0]])
+    return None
+
+
+def _record_arrival(problem: MissionProblem, day: int, layer: np.ndarray,
+                    best: Optional[Tuple[int, int, int]]) -> Optional[Tuple[int, int, int]]:
+    """Keep the cheapest (encounters, day, fuel) arrival seen so far, preferring the earliest day on ties."""
+    row = layer[problem.arrival]
+    fuel = int(row.argmin())
+    cost = int(row[fuel])
+    if cost < INF and (best is None or cost < best[0]):
+        return cost, day, fuel
+    return best
+
+
+def solve_layered(problem: MissionProblem) -> Solution:
+    """
+    Day-layered dynamic programme over (planet, fuel) states. One layer per day of the countdown is kept so
+    the best itinerary can be traced back directly; memory grows with countdown x planets x autonomy.
+    """
+    layers: Dict[int, np.ndarray] = {}
+
+    def get_target(day: int) -> np.ndarray:
+        if day not in layers:
+            layers[day] = problem.new_layer()
+        return layers[day]
+
+    get_target(0)[problem.departure, problem.autonomy] = problem.hunters(problem.departure, 0)
+    best = None
+    for day in range(problem.countdown + 1):
+        layer = layers.get(day)
+        if layer is None:
+            continue
+        best = _record_arrival(problem, day, layer, best)
+        if best is not None and best[0] == 0:
+            break
+        _relax_day(problem, day, layer, get_target)
+
+    if best is None:
+        return None
+    cost, day, fuel = best
+    return cost, _backtrack(problem, problem.arrival, day, fuel, cost, layers.get)
+
+
+def _rolling_layers(window: int, days: int, spacings: List[int]) -> int:
+    """Layers held at peak by `solve_rolling` with the given checkpoint spacings."""
+    if len(spacings) == 1:
+        return window + days  # the live ring plus every layer, nothing is replayed
+    layers = window + math.ceil(days / spacings[0]) * window  # live ring and forward checkpoints
+    for coarse, fine in zip(spacings, spacings[1:]):
+        # two cached segments of saved states (single layers at the finest level) and a working ring
+        layers += 2 * (coarse // fine) * (1 if fine == 1 else window) + window
+    return layers
+
+
+def _checkpoint_spacings(problem: MissionProblem, window: int, memory_budget: int) -> List[int]:
+    """
+    Days between saved states on each checkpoint level, coarsest first and ending with 1. The forward pass
+    saves the ring every spacings[0] days; each replay level recomputes one segment of the level above and
+    saves a state every spacings[k] days of it, the finest level only the complete layers. For a given number
+    of levels the ratios between spacings are chosen so every level costs about the same (the finest level
+    stores single layers, so it gets longer segments), which keeps peak memory logarithmic in the countdown.
+    Every extra level replays the countdown once more, so the budget picks the fewest levels that fit.
+    """
+    layer_bytes = len(problem.planets) * (problem.autonomy + 1) * np.dtype(np.int32).itemsize
+    days = problem.countdown + 1
+    smallest = None
+    for levels in range(1, max(1, math.ceil(math.log2(days))) + 2):
+        # Cost of one step of each ratio: forward checkpoints, cached ring states, cached single layers
+        weights = [window] + [2 * window] * (levels - 2) + [2] if levels > 1 else [1]
+        scale = (days * math.prod(weights)) ** (1 / levels)
+        ratios = [max(1, math.ceil(scale / weight)) for weight in weights]
+        spacings = [math.prod(ratios[level + 1:]) for level in range(levels)]
+        needed = _rolling_layers(window, days, spacings) * layer_bytes
+        if needed <= memory_budget:
+            return spacings
+        smallest = needed if smallest is None else min(smallest, needed)
+    raise ValueError(f"Memory budget of {memory_budget} bytes is too small for the rolling solver "
+                     f"(needs about {smallest} bytes)")
+
+
+def solve_rolling(problem: MissionProblem, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Solution:
+    """
+    Memory-bounded variant of `solve_layered`. A single-hop jump lands at most (travel time + 1) days ahead,
+    refuel day included, so the ring buffer only keeps the current day and that many after it: max travel
+    time + 2 layers (`max_jump_days + 1`). Arrivals over corridors
+    merged by `reduce_routes` can land much further ahead; they are kept in small per-day dicts and folded into
+    the ring when their day comes round, so merging never widens the ring. The itinerary is rebuilt from
+    multi-level checkpoints: the forward pass saves a few coarse copies of that state, replaying the days
+    between two of them saves finer ones, and so on down to the single layers the backtrack reads. Memory
+    grows with the logarithm of the countdown and stays within `memory_budget` bytes, which picks the number
+    of levels (see `_checkpoint_spacings`).
+    """
+    window = problem.max_jump_days + 1
+    spacings = _checkpoint_spacings(problem, window, memory_budget)
+    # (ring of the next `window` layers, day -> {(planet, fuel): encounters} for corridor arrivals)
+    State = Tuple[np.ndarray, Dict[int, Dict[Tuple[int, int], int]]]
+
+    def copy_state(state: State) -> State:
+        ring, deferred = state
+        return ring.copy(), {day: dict(arrivals) for day, arrivals in deferred.items()}
+
+    def start_day(state: State, day: int) -> np.ndarray:
+        """Fold the corridor arrivals for `day` into its layer, which is then complete, and return it."""
+        ring, deferred = state
+        layer = ring[day % window]
+        for (planet, fuel), cost in deferred.pop(day, {}).items():
+            if cost < layer[planet, fuel]:
+                layer[planet, fuel] = cost
+        return layer
+
+    def step(state: State, day: int) -> None:
+        ring, deferred = state
+
+        def defer(arrive: int, planet: int, fuels: np.ndarray, costs: np.ndarray) -> None:
+            reached = costs < INF
+            arrivals = deferred.setdefault(arrive, {})
+            for fuel, cost in zip(fuels[reached].tolist(), costs[reached].tolist()):
+                if cost < arrivals.get((planet, fuel), INF):
+                    arrivals[(planet, fuel)] = cost
+
+        layer = ring[day % window]
+        _relax_day(problem, day, layer, lambda target_day: ring[target_day % window], defer)
+        layer.fill(INF)
+
+    def save(state: State, day: int, spacing: int, saved: Dict[int, object]) -> None:
+        """Keep a copy of the state on days that are a multiple of `spacing`, only the layer for `day` if 1."""
+        if day % spacing == 0:
+            saved[day] = state[0][day % window].copy() if spacing == 1 else copy_state(state)
+
+    state: State = (np.full((window, len(problem.planets), problem.autonomy + 1), INF, dtype=np.int32), {})
+    state[0][0][problem.departure, problem.autonomy] = problem.hunters(problem.departure, 0)
+    checkpoints: Dict[int, object] = {}
+    best = None
+    for day in range(problem.countdown + 1):
+        layer = start_day(state, day)
+        save(state, day, spacings[0], checkpoints)
+        best = _record_arrival(problem, day, layer, best)
+        if best is not None and best[0] == 0:
+            break
+        step(state, day)
+
+    if best is None:
+        return None
+
+    # Two replayed segments per level, so the backtrack can look back across a segment boundary. Nothing after
+    # the arrival day is ever read, so replays stop there even when the countdown runs much longer.
+    last_day = best[1]
+    segments: List["OrderedDict[int, Dict[int, object]]"] = [OrderedDict() for _ in spacings[1:]]
+
+    def saved_at(level: int, day: int):
+        """What `level` saved on `day`, replaying the enclosing segment from the level above if needed."""
+        if level == 0:
+            return checkpoints.get(day)
+        spacing = spacings[level - 1]
+        start = day - day % spacing
+        cache = segments[level - 1]
+        if start not in cache:
+            replayed = copy_state(saved_at(level - 1, start))
+            stop = min(start + spacing - 1, last_day)
+            saved: Dict[int, object] = {}
+            for replay_day in range(start, stop + 1):
+                start_day(replayed, replay_day)
+                save(replayed, replay_day, spacings[level], saved)
+                if replay_day < stop:
+                    step(replayed, replay_day)
+            cache[start] = saved
+            if len(cache) > 2:
+                cache.popitem(last=False)
+        cache.move_to_end(start)
+        return cache[start].get(day)
+
+    cost, day, fuel = best
+    return cost, _backtrack(problem, problem.arrival, day, fuel, cost,
+                            lambda layer_day: saved_at(len(spacings) - 1, layer_day))
+
+
+class _LabelStore:
+    """Append-only arrays of every kept label, remembering how each was reached so itineraries can be rebuilt."""
+
+    def __init__(self):
+        # Days and fuel levels are 64-bit: the event-driven solver is meant for countdowns beyond 2**31
+        self.planet = array("i")
+        self.day = array("q")
+        self.fuel = array("q")
+        self.parent = array("i")
+
+    def add(self, planet: int, day: int, fuel: int, parent: int) -> int:
+        self.planet.append(planet)
+        self.day.append(day)
+        self.fuel.append(fuel)
+        self.parent.append(parent)
+        return len(self.planet) - 1
+
+    def itinerary(self, problem: MissionProblem, label: int) -> Itinerary:
+        states = []
+        while label >= 0:
+            states.append((self.planet[label], self.day[label], self.fuel[label]))
+            label = self.parent[label]
+        states.reverse()
+        return problem.itinerary(states)
+
+
+class _LabelBucket:
+    """
+    Labels for one (planet, day) as compact parallel arrays sorted by fuel, one label per useful fuel level.
+    More fuel is not always better here (a forced refuel day can dodge a hunter), so labels are only merged,
+    keeping the fewest encounters, once `MissionProblem.useful_fuel` has mapped them to the same level.
+    """
+    __slots__ = ("fuel", "cost", "label")
+
+    def __init__(self):
+        self.fuel = array("q")
+        self.cost = array("i")
+        self.label = array("i")
+
+    def insert(self, fuel: int, cost: int) -> int:
+        """Slot now holding (fuel, cost), or -1 when an existing label is at least as good."""
+        i = bisect_left(self.fuel, fuel)
+        if i < len(self.fuel) and self.fuel[i] == fuel:
+            if cost >= self.cost[i]:
+                return -1
+            self.cost[i] = cost
+            return i
+        self.fuel.insert(i, fuel)
+        self.cost.insert(i, cost)
+        self.label.insert(i, -1)
+        return i
+
+    def cheapest(self) -> int:
+        """Slot with the fewest encounters."""
+        return min(range(len(self.cost)), key=self.cost.__getitem__)
+
+
+def _offer_label(problem: MissionProblem, store: _LabelStore, pending: Dict[int, Dict[int, _LabelBucket]],
+                 planet: int, day: int, fuel: int, cost: int, parent: int) -> None:
+    """Add a label to the bucket for (planet, day) unless that bucket already has an equal or better one."""
+    bucket = pending.setdefault(day, {}).get(planet)
+    if bucket is None:
+        bucket = pending[day][planet] = _LabelBucket()
+    fuel = problem.useful_fuel(planet, day, fuel)
+    slot = bucket.insert(fuel, cost)
+    if slot >= 0:
+        bucket.label[slot] = store.add(planet, day, fuel, parent)
+
+
+def _expand_bucket(problem: MissionProblem, planet: int, day: int, bucket: _LabelBucket,
+                   emit: Callable[[int, int, int, int, int], None]) -> None:
+    """
+    Extend every label of `bucket` along each route out of `planet`, calling emit(planet, day, fuel, cost,
+    parent) for each new label. Labels with enough fuel for the first hop jump straight away; the ones that
+    must refuel first all leave with a full tank, so only the cheapest of them (a prefix minimum over the
+    fuel-sorted array) is extended.
+    """
+    fuels, costs, labels = bucket.fuel, bucket.cost, bucket.label
+    cheapest = []
+    best = 0
+    for i in range(len(costs)):
+        if costs[i] < costs[best]:
+            best = i
+        cheapest.append(best)
+
+    for destination, times in problem.outgoing.get(planet, ()):
+        first_direct = bisect_left(fuels, times[0])
+
+        for i in range(first_direct, len(fuels)):
+            days, fuel, _ = problem.traverse(times, fuels[i])
+            arrive = day + days
+            if arrive <= problem.countdown:
+                emit(destination, arrive, fuel, costs[i] + problem.hunters(destination, arrive), labels[i])
+
+        if first_direct > 0:
+            i = cheapest[first_direct - 1]
+            days, fuel, _ = problem.traverse(times, fuels[i])
+            arrive = day + days
+            if arrive <= problem.countdown:
+                met = 2 * problem.hunters(planet, day + 1) + problem.hunters(destination, arrive)
+                emit(destination, arrive, fuel, costs[i] + met, labels[i])
+
+
+def _settle_day(problem: MissionProblem, day: int, buckets: Dict[int, _LabelBucket],
+                best: Optional[Tuple[int, int]],
+                emit: Callable[[int, int, int, int, int], None]) -> Optional[Tuple[int, int]]:
+    """
+    Handle every label reached on `day`: arrivals update the best (encounters, label) found so far, everything
+    else is extended along its routes. Days are settled in increasing order, so all labels for a day are in.
+    """
+    arrived = buckets.pop(problem.arrival, None)
+    if arrived is not None:
+        slot = arrived.cheapest()
+        if best is None or arrived.cost[slot] < best[0]:
+            best = (arrived.cost[slot], arrived.label[slot])
+            if best[0] == 0:
+                return best
+    for planet, bucket in buckets.items():
+        _expand_bucket(problem, planet, day, bucket, emit)
+    return best
+
+
+def solve_labels(problem: MissionProblem) -> Solution:
+    """
+    Label-setting search that sweeps the days in order and keeps, per (planet, day), only the labels with
+    distinct useful fuel levels instead of a dense 0..autonomy fuel axis. Work and memory grow with the number
+    of fuel levels the routes can actually produce, not with the size of the autonomy.
+    """
+    store = _LabelStore()
+    pending: Dict[int, Dict[int, _LabelBucket]] = {}
+
+    def emit(planet: int, day: int, fuel: int, cost: int, parent: int) -> None:
+        _offer_label(problem, store, pending, planet, day, fuel, cost, parent)
+
+    emit(problem.departure, 0, problem.autonomy, problem.hunters(problem.departure, 0), -1)
+    best: Optional[Tuple[int, int]] = None  # (encounters, label)
+    for day in range(problem.countdown + 1):
+        buckets = pending.pop(day, None)
+        if buckets is None:
+            continue
+        best = _settle_day(problem, day, buckets, best, emit)
+        if best is not None and best[0] == 0:
+            break
+
+    if best is None:
+        return None
+    return best[0], store.itinerary(problem, best[1])
+
+
+def solve_events(problem: MissionProblem) -> Solution:
+    """
+    Event-driven variant of `solve_labels`. Each jump schedules an arrival event, and a priority queue of
+    event days lets the search go straight from one day where something lands to the next, skipping the
+    empty days in between. The cost grows with the number of events rather than with the countdown, which
+    pays off when travel times and the countdown run into the millions and beyond; where most days see an
+    arrival the heap only adds overhead and `solve_labels` is as fast.
+    """
+    store = _LabelStore()
+    pending: Dict[int, Dict[int, _LabelBucket]] = {}
+    events: List[int] = []
+
+    def emit(planet: int, day: int, fuel: int, cost: int, parent: int) -> None:
+        if day not in pending:
+            heapq.heappush(events, day)
+        _offer_label(problem, store, pending, planet, day, fuel, cost, parent)
+
+    emit(problem.departure, 0, problem.autonomy, problem.hunters(problem.departure, 0), -1)
+    best: Optional[Tuple[int, int]] = None  # (encounters, label)
+    while events:
+        day = heapq.heappop(events)
+        best = _settle_day(problem, day, pending.pop(day), best, emit)
+        if best is not None and best[0] == 0:
+            break
+
+    if best is None:
+        return None
+    return best[0], store.itinerary(problem, best[1])
+
+
+SOLVERS: Dict[str, Callable[..., Solution]] = {
+    "layered": solve_layered,
+    "rolling": solve_rolling,
+    "labels": solve_labels,
+    "events": solve_events,
+}
@@ -1,5 +1,15 @@
+import io
+import json
+import random
+import time
+from pathlib import Path
+
 import pytest
 from millennium_falcon import MillenniumFalcon
+from mission_rendering import render_mission
+import mission_solvers
+from mission_solvers import (SOLVERS, MissionProblem, _checkpoint_spacings, _LabelStore, _offer_label, fly,
+                             reduce_routes, solve_events, solve_layered, solve_rolling)
 
 @pytest.fixture
 def setup_falcon():
@@ -24,4 +34,202 @@ def test_calculate_odds_044(setup_falcon):
     falcon = setup_falcon
     odds = falcon.calculate_odds("data/empire044.json")
     assert odds == 90.0
-    
\ No newline at end of file
+
+@pytest.mark.parametrize("solver", ["layered", "rolling", "labels", "events"])
+@pytest.mark.parametrize("empire_file, expected", [
+    ("data/empire041.json", 0.0),
+    ("data/empire042.json", 72.90),
+    ("data/empire043.json", 90.00),
+    ("data/empire044.json", 90.0),
+])
+def test_calculate_odds_solvers(solver, empire_file, expected):
+    falcon = MillenniumFalcon("data/millennium-falcon.json", solver=solver)
+    assert falcon.calculate_odds(empire_file) == pytest.approx(expected)
+
+def test_rolling_solver_rebuilds_best_itinerary():
+    falcon = MillenniumFalcon("data/millennium-falcon.json", solver="rolling", memory_budget=8192)
+    odds, debug_info = falcon.calculate_odds_with_debug("data/empire042.json")
+    assert odds == pytest.approx(72.90)
+    assert "Day 0: START at Tatooine" in debug_info
+    assert "TRAVEL at Endor" in debug_info
+    assert "Total encounters: 3" in debug_info
+
+def test_rolling_solver_memory_budget_too_small():
+    falcon = MillenniumFalcon("data/millennium-falcon.json", solver="rolling", memory_budget=64)
+    with pytest.raises(ValueError):
+        falcon.calculate_odds("data/empire042.json")
+
+def test_rolling_solver_checkpoint_levels_follow_budget():
+    routes = {"A": {"B": 3, "C": 2}, "B": {"A": 3, "C": 4}, "C": {"A": 2, "B": 4}}
+    hunters = {("B", day) for day in range(0, 2000, 3)} | {("C", day) for day in range(1, 2000, 5)}
+    problem = MissionProblem(routes, 5, "A", "B", 2000, hunters)
+    window = problem.max_jump_days + 1
+    layer_bytes = len(problem.planets) * (problem.autonomy + 1) * 4
+    assert _checkpoint_spacings(problem, window, 10 ** 9) == [1]
+    # A budget far below one layer per day still fits by adding checkpoint levels
+    spacings = _checkpoint_spacings(problem, window, 50 * window * layer_bytes)
+    assert len(spacings) > 2 and spacings[-1] == 1
+    assert all(coarse % fine == 0 for coarse, fine in zip(spacings, spacings[1:]))
+    assert solve_rolling(problem, 50 * window * layer_bytes)[0] == solve_layered(problem)[0]
+
+def test_useful_fuel_merges_equivalent_levels():
+    problem = MissionProblem({"Tatooine": {"Hoth": 3}, "Hoth": {"Tatooine": 3, "Endor": 2}}, 1000, "Tatooine",
+                             "Endor", 20, set())
+    tatooine, endor = problem.index["Tatooine"], problem.index["Endor"]
+    assert problem.useful_fuel(tatooine, 10, 5) == 5
+    assert problem.useful_fuel(tatooine, 10, 900) == 10  # never runs dry in the 10 days left
+    assert problem.useful_fuel(tatooine, 10, 2) == 0  # must refuel before any jump
+    assert problem.useful_fuel(endor, 10, 5) == 0
+
+
+def test_label_bucket_keeps_one_label_per_useful_fuel():
+    problem = MissionProblem({"Tatooine": {"Hoth": 3}, "Hoth": {"Tatooine": 3}}, 1000, "Tatooine", "Hoth", 20,
+                             set())
+    store, pending = _LabelStore(), {}
+    tatooine = problem.index["Tatooine"]
+    for fuel in range(problem.autonomy + 1):
+        _offer_label(problem, store, pending, tatooine, 10, fuel, 1, -1)
+    bucket = pending[10][tatooine]
+    assert list(bucket.fuel) == [0] + list(range(3, 11))
+    assert len(store.planet) == len(bucket.fuel)
+
+
+@pytest.mark.parametrize("solver", ["labels", "events"])
+@pytest.mark.parametrize("autonomy", [3, 6, 500])
+def test_label_solvers_match_layered(solver, autonomy):
+    rng = random.Random(autonomy)
+    for _ in range(20):
+        planets = [f"Planet-{i}" for i in range(rng.randint(3, 8))]
+        routes = {planet: {} for planet in planets}
+        for _ in range(2 * len(planets)):
+            origin, destination = rng.sample(planets, 2)
+            routes[origin][destination] = routes[destination][origin] = rng.randint(1, 6)
+        countdown = rng.randint(5, 30)
+        hunters = {(rng.choice(planets), rng.randint(0, countdown)) for _ in range(3 * len(planets))}
+        problem = MissionProblem(routes, autonomy, planets[0], planets[-1], countdown, hunters)
+        expected = solve_layered(problem)
+        solution = SOLVERS[solver](problem)
+        assert (solution is None) == (expected is None)
+        if solution is not None:
+            assert solution[0] == expected[0]
+            assert sum((planet, day) in hunters for planet, day, _ in solution[1]) == solution[0]
+
+def test_events_solver_skips_empty_days():
+    # Jumps of tens of billions of days: a day-by-day sweep would never reach the first arrival
+    days = 10 ** 10
+    routes = {
+        "Tatooine": {"Endor": 10 * days, "Hoth": 3 * days},
+        "Hoth": {"Tatooine": 3 * days, "Endor": 6 * days},
+        "Endor": {"Tatooine": 10 * days, "Hoth": 6 * days},
+    }
+    hunters = {("Endor", 9 * days), ("Endor", 10 * days)}
+    problem = MissionProblem(routes, 10 * days, "Tatooine", "Endor", 100 * days, hunters)
+    assert solve_events(problem) == (0, [
+        ("Tatooine", 0, "START"), ("Hoth", 3 * days, "TRAVEL"), ("Tatooine", 6 * days, "TRAVEL"),
+        ("Hoth", 9 * days, "TRAVEL"), ("Hoth", 9 * days + 1, "REFUEL"), ("Hoth", 9 * days + 1, "WAIT"),
+        ("Endor", 15 * days + 1, "TRAVEL"),
+    ])
+
+def test_reduce_routes_prunes_planets_outside_countdown(setup_falcon):
+    falcon = setup_falcon
+    # Tatooine -> Dagobah -> Endor takes at least 6 + 2 days, more than a 7 day countdown
+    routes, chains = reduce_routes(falcon.routes, falcon.departure, falcon.arrival, 7, {("Hoth", 6)})
+    assert set(routes) == {"Tatooine", "Hoth", "Endor"}
+    assert chains == {}
+
+def test_reduce_routes_merges_hunter_free_corridor():
+    routes = {
+        "A": {"B": 2},
+        "B": {"A": 2, "C": 3},
+        "C": {"B": 3, "D": 1},
+        "D": {"C": 1},
+    }
+    reduced, chains = reduce_routes(routes, "A", "D", 7, {("A", 1)})
+    assert reduced == {"A": {"D": 6}, "D": {"A": 6}}
+    assert chains[("A", "D")] == [("B", 2), ("C", 3), ("D", 1)]
+    steps, day, fuel = fly("A", chains[("A", "D")], 0, 4, 4)
+    assert steps == [("B", 2, "TRAVEL"), ("B", 3, "REFUEL"), ("B", 3, "WAIT"), ("C", 6, "TRAVEL"),
+                     ("D", 7, "TRAVEL")]
+    assert (day, fuel) == (7, 0)
+
+def test_rolling_solver_replays_only_up_to_early_arrival(monkeypatch):
+    planets = [f"Planet-{i}" for i in range(8)]
+    routes = {planet: {} for planet in planets}
+    for origin, destination in zip(planets, planets[1:]):
+        routes[origin][destination] = routes[destination][origin] = 3
+    problem = MissionProblem(routes, 6, planets[0], planets[-1], 20000, set())
+    window = problem.max_jump_days + 1
+    layer_bytes = len(problem.planets) * (problem.autonomy + 1) * 4
+    budget = 60 * window * layer_bytes
+    assert len(_checkpoint_spacings(problem, window, budget)) > 2
+    relaxed = []
+    relax_day = mission_solvers._relax_day
+    monkeypatch.setattr(mission_solvers, "_relax_day", lambda *args: relaxed.append(args[1]) or relax_day(*args))
+    encounters, itinerary = solve_rolling(problem, budget)
+    arrival_day = itinerary[-1][1]
+    assert encounters == 0
+    # The forward pass and every replay level stop at the arrival, thousands of days before the countdown
+    assert max(relaxed) < arrival_day
+    assert len(relaxed) <= arrival_day * len(_checkpoint_spacings(problem, window, budget))
+
+def test_rolling_window_not_widened_by_merged_corridor():
+    corridor = ["Alderaan"] + [f"Link-{i}" for i in range(10)] + ["Bespin"]
+    routes = {planet: {} for planet in corridor}
+    for origin, destination in zip(corridor, corridor[1:]):
+        routes[origin][destination] = routes[destination][origin] = 20
+    hunters = {("Bespin", 220)}
+    reduced, chains = reduce_routes(routes, "Alderaan", "Bespin", 230, hunters)
+    assert len(chains[("Alderaan", "Bespin")]) == 11
+    full = MissionProblem(routes, 1000, "Alderaan", "Bespin", 230, hunters)
+    merged = MissionProblem(reduced, 1000, "Alderaan", "Bespin", 230, hunters, chains)
+    assert merged.max_jump_days <= full.max_jump_days
+    # A ring spanning the whole corridor would need tens of MB here
+    assert solve_rolling(merged, 1024 * 1024) == solve_layered(full)
+
+def test_render_mission_uses_solved_itinerary(setup_falcon):
+    falcon = setup_falcon
+    odds = falcon.calculate_odds("data/empire043.json")
+    assert falcon.best_path[0] == ("Tatooine", 0, "START")
+    assert falcon.best_path[-1][0] == "Endor"
+    assert (falcon.countdown, falcon.bounty_hunters) == falcon.load_empire_data("data/empire043.json")
+    assert falcon.countdown == 9
+    assert falcon.bounty_hunters == {("Hoth", 6), ("Hoth", 7), ("Hoth", 8)}
+    image = render_mission(falcon.routes, falcon.departure, falcon.arrival, falcon.countdown,
+                           falcon.bounty_hunters, falcon.best_path, odds)
+    assert image.startswith(b"\x89PNG")
+
+def test_visualizers_use_solved_empire_data(setup_falcon):
+    falcon = setup_falcon
+    assert falcon._solved_empire_data("data/empire041.json") == falcon.load_empire_data("data/empire041.json")
+    falcon.calculate_odds("data/empire043.json")
+    assert falcon._solved_empire_data("data/empire041.json") == (9, {("Hoth", 6), ("Hoth", 7), ("Hoth", 8)})
+
+def test_render_mission_without_routes():
+    assert render_mission({}, "Tatooine", "Endor", 5, set(), None, 0.0).startswith(b"\x89PNG")
+
+def test_calculate_endpoint_serves_visualization(tmp_path, monkeypatch):
+    data_dir = Path("data").resolve()
+    monkeypatch.chdir(tmp_path)  # the app saves its uploads relative to the working directory
+    from app import app
+    config = json.loads((data_dir / "millennium-falcon.json").read_text())
+    config["routes_db"] = str(data_dir / config["routes_db"])
+    client = app.test_client()
+    response = client.post("/calculate", data={
+        "millennium": (io.BytesIO(json.dumps(config).encode()), "millennium-falcon.json"),
+        "empire": (io.BytesIO((data_dir / "empire043.json").read_bytes()), "empire.json"),
+    }, content_type="multipart/form-data")
+    result = response.get_json()
+    assert result["success"] and result["odds"] == pytest.approx(90.0)
+    url = result["visualization_url"]
+
+    # Rendering starts with the first request for the image
+    assert client.get(url).status_code == 202
+    for _ in range(300):
+        image = client.get(url)
+        if image.status_code != 202:
+            break
+        time.sleep(0.1)
+    assert image.status_code == 200
+    assert image.data.startswith(b"\x89PNG")
+    assert client.get("/visualization/unknown.png").status_code == 404
+    assert client.get(url.replace(".png", ".gif")).status_code == 404